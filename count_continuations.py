@@ -36,13 +36,29 @@
 # This makes it possible to measure the frequency of each word as a sentence
 # starter and after the abbreviation marker versus its general corpus
 # frequency in default cases.
+#
+# If all tokens are ASCII, the ASCII blocks of the input are scanned as bytes;
+# All other blocks are decoded, so that non-ASCII word characters and spaces
+# are found, too.
+# If the (optional) hyperscan package is installed, all patterns are matched
+# in a single pass over each of those ASCII blocks; otherwise, the re module
+# is used.
 
+import io
 import logging
+import multiprocessing
 import os
 import sys
 from argparse import ArgumentParser
+from array import array
+from collections import Counter
 import re
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # fall back to scanning with the re module
+
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
 __version__ = 1
@@ -64,64 +80,449 @@ parser.add_argument('--quiet', '-q', action='count', default=0,
                     help='decrease log level [WARN]')
 parser.add_argument('--abbreviations', action='store_true',
                     help='only count abbreviation-to-sentence-start usage')
-args = parser.parse_args()
-
-# logging setup
-log_adjust = max(min(args.quiet - args.verbose, 2), -2) * 10
-log_format = '%(levelname)-8s %(module) 10s: %(funcName)s %(message)s'
-logging.basicConfig(level=logging.WARNING + log_adjust,
-                    format=log_format)
-logging.info('verbosity increased')
-logging.debug('verbosity increased')
-
-def sentence_start_pattern(continuation):
-    capitalized_continuation = continuation.capitalize()
-    pattern = r'(?:^|>|\t|\.\s)\s*{}\b'
-    return re.compile(pattern.format(capitalized_continuation))
-
-def abbreviation_pattern(continuation):
-    pattern = r'\.\s+{}\b'
-    return re.compile(pattern.format(continuation))
-
-inside_sentence = {}
-sentence_start = {}
-after_abbreviation = {}
-
-for c in args.continuations:
-    inside_sentence[c] = [re.compile(r'\b{}\b'.format(c)), 0]
-    sentence_start[c] = [sentence_start_pattern(c), 0]
-    after_abbreviation[c] = [abbreviation_pattern(c), 0]
-
-cases = (sentence_start, after_abbreviation) if args.abbreviations else \
-    (inside_sentence, sentence_start, after_abbreviation)
-
-for line in sys.stdin:
-    for continuation in args.continuations:
-        for target in cases:
-            pattern_count = target[continuation]
-            pattern_count[1] += len(pattern_count[0].findall(line))
-
-if not args.abbreviations:
-    print("Freq.SS | Likelih. | N.abbrev. | N.starters | N.inside | Word")
-else:
-    print("Likelih. | N.abbrev. | N.starters | Word")
-
-for continuation in inside_sentence:
-    starter_count = sentence_start[continuation][1]
-    inside_count = inside_sentence[continuation][1]
-    abbrev_count = after_abbreviation[continuation][1]
-    total = starter_count + inside_count
-    after_dot = starter_count + abbrev_count
-    ss_fraction = (starter_count / float(total)) if total > 0 else 0.0
-    likelihood = (abbrev_count / after_dot) if after_dot > 0 else 0.0
+parser.add_argument('--jobs', '-j', metavar='N', type=int, default=1,
+                    help='number of processes to scan the input with [1]')
+parser.add_argument('--encoding', '-e', default='utf-8',
+                    help='encoding of the input [%(default)s]')
 
-    if not args.abbreviations:
-        print('%.3f' % ss_fraction, end=' | ')
+CHUNK_SIZE = 1 << 20
+"Approximate size of the input blocks (in bytes) that are scanned at once."
+
+SPACE = r'[^\S\n]'
+"Any space except newlines, as patterns must not match across lines in a block."
+
+WORD_BYTES = frozenset(b'0123456789'
+                       b'ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz')
+"The word characters (\\w) of bytes patterns."
+
+SPACE_BYTES = frozenset(b' \t\r\x0b\x0c')
+"The bytes matched by SPACE in bytes patterns."
+
+STR_SPACE_BYTES = (b'\x1c', b'\x1d', b'\x1e', b'\x1f')
+"ASCII information separators, which only str patterns match as spaces (\\s)."
+
+NON_ASCII_SAMPLE = '\u00e9\u00df\u0416\u20ac\u3042\u4e2d\ud55c'
+"Characters of which no ASCII-compatible encoding has an ASCII-only encoding."
+
+EDGE_BYTES = frozenset(b'\n>')
+"Bytes that may precede a sentence start (besides a dot or tab)."
+
+DOT = ord('.')
+
+INSIDE, START, ABBREV = range(3)
+
+
+# The pattern functions expect the words (capitalized for sentence starts).
+
+def trie(words):
+    """Escape and join the words into an alternation of their common prefixes.
+
+    Like segtok's CONTINUATIONS pattern, this spares the regex engine from
+    retrying the same prefix for each word, e.g. ``a(?:nd|re)|b(?:etween|y)``.
+    """
+    root = {}
+
+    for word in words:
+        node = root
+
+        for char in word:
+            node = node.setdefault(char, {})
+
+        node[''] = {}  # a word ends here
+
+    def branches(node):
+        alternatives = [re.escape(char) + branches(node[char])
+                        for char in sorted(node) if char]
+
+        if '' not in node and len(alternatives) == 1:
+            return alternatives[0]
+        elif alternatives:
+            optional = '?' if '' in node else ''
+            return '(?:{}){}'.format('|'.join(alternatives), optional)
+        else:
+            return ''
+
+    return branches(root)
+
+def alternation(words):
+    """A single group, so `findall` returns the matched words."""
+    return '({})'.format(trie(words))
+
+def inside_sentence_pattern(words):
+    pattern = r'\b(?:{})\b'
+    return pattern.format(alternation(words))
+
+def sentence_start_pattern(words):
+    pattern = r'(?:^|>|\t|\.{0}){0}*(?:{1})\b'
+    return pattern.format(SPACE, alternation(words))
+
+def abbreviation_pattern(words):
+    pattern = r'\.{0}+(?:{1})\b'
+    return pattern.format(SPACE, alternation(words))
+
+def context_pattern(capitalized, words):
+    """Capitalized words after a newline, '>', or tab, or any words after a dot.
+
+    Consuming the newline instead of matching ``^`` lets the regex engine skip
+    ahead to the context characters, but the first line needs a separate match.
+    """
+    pattern = r'[\n>\t]{0}*{1}\b|\.{0}+{2}\b'
+    return pattern.format(SPACE, alternation(capitalized), alternation(words))
+
+def first_line_pattern(capitalized):
+    pattern = r'{0}*{1}\b'
+    return pattern.format(SPACE, alternation(capitalized))
+
+def count_lowercase(data, word, word_bytes=WORD_BYTES, space_bytes=SPACE_BYTES):
+    """Count `word` inside sentences and after a dot and spaces (abbreviations).
+
+    Matches like the regex patterns if `word` starts and ends with a \\w.
+    """
+    find = data.find
+    end = len(data)
+    size = len(word)
+    inside = abbrev = 0
+    offset = find(word)
+
+    while offset != -1:
+        after = offset + size
+
+        if (after == end or data[after] not in word_bytes) and \
+                (offset == 0 or data[offset - 1] not in word_bytes):
+            inside += 1
+            start = offset
+
+            while start and data[start - 1] in space_bytes:
+                start -= 1
+
+            if start != offset and start and data[start - 1] == DOT:
+                abbrev += 1
+
+            offset = find(word, after)
+        else:
+            offset = find(word, offset + 1)
+
+    return inside, abbrev
+
+def count_capitalized(data, word, word_bytes=WORD_BYTES, space_bytes=SPACE_BYTES):
+    """Count `word` at sentence starts: after a line start, '>', tab, or dot.
+
+    Matches like the regex patterns if `word` starts and ends with a \\w.
+    """
+    find = data.find
+    end = len(data)
+    size = len(word)
+    count = 0
+    offset = find(word)
+
+    while offset != -1:
+        after = offset + size
+
+        if after == end or data[after] not in word_bytes:
+            start = offset
+
+            while start and data[start - 1] in space_bytes:
+                start -= 1
+
+            if start == 0 or data[start - 1] in EDGE_BYTES or \
+                    (start != offset and data[start - 1] == DOT) or \
+                    data.find(b'\t', start, offset) != -1:
+                count += 1
+                offset = find(word, after)
+                continue
+
+        offset = find(word, offset + 1)
+
+    return count
+
+def hyperscan_database(words, cases):
+    """Compile one expression per continuation and case into a single database.
+
+    The expression ID of continuation i and case k is ``3 * i + k``.
+    The matches are reported with their leftmost start offsets, so that
+    `on_match` can drop overlapping matches (e.g., the second "a.a" in "a.a.a").
+    """
+    expressions = []
+    ids = []
+
+    for i in range(len(words[START])):
+        for pattern, case in cases:
+            expressions.append(pattern([words[case][i]]).encode('ascii'))
+            ids.append(3 * i + case)
+
+    database = hyperscan.Database()
+    database.compile(expressions=expressions, ids=ids, elements=len(ids),
+                     flags=[hyperscan.HS_FLAG_MULTILINE |
+                            hyperscan.HS_FLAG_SOM_LEFTMOST] * len(ids))
+    return database
+
+def on_match(id, start, end, flags, context):
+    """Count the match unless it overlaps the last one counted, like `findall`."""
+    counts, ends = context
+
+    if start >= ends[id]:
+        ends[id] = end
+        counts[id % 3][id // 3] += 1
+
+def hyperscan_counter(words, cases):
+    """Return a function that adds the counts of the (ASCII) words in a plain block to a table.
+
+    Like bytes patterns, Hyperscan's \\b and \\s only know ASCII characters.
+    """
+    scan_block = hyperscan_database(words, cases).scan
+    size = 3 * len(words[START])
+
+    def count(block, counts):
+        # the end offset of the last match counted per expression ID
+        ends = [0] * size
+        scan_block(block, match_event_handler=on_match, context=(counts, ends))
 
-    print('%.3f' % likelihood, abbrev_count, starter_count,
-          sep=' | ', end=' | ')
+    return count
+
+def count_table(size):
+    """One array of `size` (unboxed, 64-bit) counters per case."""
+    return [array('Q', [0]) * size for _ in range(3)]
+
+def pattern_counter(words, tokens, capitals, indices, abbreviations, compile):
+    """Return a function that adds the counts of the tokens at `indices` in a block to a table.
+
+    The fused patterns of the `words` are compiled with `compile`, to scan str
+    or bytes blocks; The `tokens` and `capitals` are the words in that type.
+    """
+    nothing = tokens[0][:0]  # an unmatched group
+    # literals at least one of which must be in a block for any match
+    needles = list(dict.fromkeys(
+        [tokens[i] for i in indices] + [capitals[i] for i in indices]
+    ))
+    subset = dict((case, [words[case][i] for i in indices]) for case in words)
+    # one scan for both sentence starts and abbreviations
+    find_context = compile(context_pattern(
+        subset[START], subset[START] + subset[ABBREV]
+    )).findall
+    match_first = compile(first_line_pattern(subset[START])).match
+    find_inside = None if abbreviations else \
+        compile(inside_sentence_pattern(subset[INSIDE])).findall
+
+    def count(block, counts):
+        inside, start, abbrev = counts
+
+        # substring tests are much cheaper than the regex scans
+        if not any(needle in block for needle in needles):
+            return
+
+        # findall and Counter count all matches in C code
+        if find_inside is not None:
+            found = Counter(find_inside(block))
+
+            for i in indices:
+                inside[i] += found[tokens[i]]
+
+        # (word after newline/>/tab, word after dot) pairs
+        found = Counter(find_context(block))
+        first = match_first(block)
+
+        if first is not None:
+            found[first.group(1), nothing] += 1
+
+        for i in indices:
+            start[i] += found[capitals[i], nothing] + found[nothing, capitals[i]]
+            abbrev[i] += found[nothing, tokens[i]]
+
+    return count
+
+def bytes_counter(words, abbreviations):
+    """Return a function that adds the counts of the (ASCII) words in a plain block to a table."""
+    def compile(pattern):
+        return re.compile(pattern.encode('ascii'))
+
+    def is_word(token):
+        return token and token[0] in WORD_BYTES and token[-1] in WORD_BYTES
+
+    tokens = [w.encode('ascii') for w in words[INSIDE]]
+    capitals = [w.encode('ascii') for w in words[START]]
+    # find is faster than the regex engine for word-bounded literals, and
+    # each occurrence is classified by the bytes that precede it
+    simple = [i for i in range(len(tokens))
+              if is_word(tokens[i]) and is_word(capitals[i])]
+    others = [i for i in range(len(tokens)) if i not in simple]
+    count_others = pattern_counter(words, tokens, capitals, others,
+                                   abbreviations, compile) if others else None
+
+    def count(block, counts):
+        inside, start, abbrev = counts
+
+        for i in simple:
+            inside_count, abbrev_count = count_lowercase(block, tokens[i])
+            inside[i] += inside_count
+            abbrev[i] += abbrev_count
+            start[i] += count_capitalized(block, capitals[i])
+
+        if count_others is not None:
+            count_others(block, counts)
+
+    return count
+
+def is_plain(block):
+    """Whether bytes patterns find the same matches in the `block` as str patterns."""
+    return block.isascii() and not any(sep in block for sep in STR_SPACE_BYTES)
+
+def ascii_compatible(encoding):
+    """Whether the ASCII bytes of any text in `encoding` are just ASCII text.
+
+    That holds for UTF-8, Latin-1, or Shift JIS, say, but not for UTF-16 or
+    for ISO-2022-JP, where other characters are encoded with ASCII bytes.
+    Raises a LookupError for unknown encodings.
+    """
+    ascii = bytes(range(128))
+
+    try:
+        if ascii.decode(encoding) != ascii.decode('ascii') or \
+                ascii.decode('ascii').encode(encoding) != ascii:
+            return False
+    except UnicodeError:
+        return False
+
+    for char in NON_ASCII_SAMPLE:
+        try:
+            if char.encode(encoding).isascii():
+                return False
+        except UnicodeEncodeError:
+            pass  # not a character of this encoding
+
+    return True
+
+def scanner(continuations, abbreviations, encoding):
+    """Return a function that adds the counts found in blocks to a table.
+
+    Blocks are undecoded bytes if the `encoding` is ASCII-compatible, or str
+    otherwise. Only plain (ASCII) blocks are scanned as bytes (or by
+    Hyperscan), and only if all tokens are ASCII, too: \\b, \\s, and \\w of
+    bytes patterns only know ASCII characters. Any other block is decoded and
+    scanned with Unicode patterns.
+    """
+    capitalized = [c.capitalize() for c in continuations]
+    words = {INSIDE: continuations, START: capitalized, ABBREV: continuations}
+    cases = ((sentence_start_pattern, START), (abbreviation_pattern, ABBREV))
+    ascii_tokens = all(word.isascii() for word in continuations + capitalized)
+
+    if not abbreviations:
+        cases = ((inside_sentence_pattern, INSIDE),) + cases
+
+    count_text = pattern_counter(words, words[INSIDE], words[START],
+                                 range(len(continuations)), abbreviations,
+                                 re.compile)
+
+    if not ascii_tokens:
+        count_plain = None
+    elif hyperscan is not None:
+        count_plain = hyperscan_counter(words, cases)
+    else:
+        count_plain = bytes_counter(words, abbreviations)
+
+    def scan(blocks, counts):
+        for block in blocks:
+            if isinstance(block, bytes):
+                if count_plain is not None and is_plain(block):
+                    count_plain(block, counts)
+                    continue
+
+                block = block.decode(encoding)
+
+            count_text(block, counts)
+
+    return scan
+
+def read_chunks(stream, size=CHUNK_SIZE):
+    """Yield blocks of about `size` bytes or chars that end in a newline from a buffered `stream`."""
+    while True:
+        block = stream.read(size)
+
+        if not block:
+            break
+
+        if not block.endswith(b'\n' if isinstance(block, bytes) else '\n'):
+            block += stream.readline()  # from the buffer, in most cases
+
+        yield block
+
+def init_worker(continuations, abbreviations, encoding):
+    # compile the patterns once per process, as they cannot be pickled
+    global worker_scan, worker_size
+    worker_scan = scanner(continuations, abbreviations, encoding)
+    worker_size = len(continuations)
+
+def count_chunk(chunk):
+    counts = count_table(worker_size)
+    worker_scan((chunk,), counts)
+    return counts
+
+def main():
+    args = parser.parse_args()
+
+    # logging setup
+    log_adjust = max(min(args.quiet - args.verbose, 2), -2) * 10
+    log_format = '%(levelname)-8s %(module) 10s: %(funcName)s %(message)s'
+    logging.basicConfig(level=logging.WARNING + log_adjust,
+                        format=log_format)
+
+    # count a repeated token once: the original script scanned it once per
+    # repetition, reporting it in a single row with multiplied counts
+    continuations = list(dict.fromkeys(args.continuations))
+    counts = count_table(len(continuations))
+
+    try:
+        ascii_input = ascii_compatible(args.encoding)
+    except LookupError:
+        parser.error('unknown encoding: {}'.format(args.encoding))
+
+    # a large buffer to complete the chunks' last lines from
+    stdin = io.open(sys.stdin.fileno(), 'rb', buffering=CHUNK_SIZE, closefd=False)
+
+    if not ascii_input:
+        # lines and words can only be found in the decoded text
+        stdin = io.TextIOWrapper(stdin, args.encoding, newline='')
+
+    if args.jobs > 1:
+        with multiprocessing.Pool(
+            args.jobs, init_worker,
+            (continuations, args.abbreviations, args.encoding)
+        ) as pool:
+            chunks = read_chunks(stdin)
+
+            for chunk_counts in pool.imap_unordered(count_chunk, chunks, 4):
+                for counter, part in zip(counts, chunk_counts):
+                    for i, count in enumerate(part):
+                        counter[i] += count
+    else:
+        scan = scanner(continuations, args.abbreviations, args.encoding)
+        scan(read_chunks(stdin), counts)
 
     if not args.abbreviations:
-        print(inside_count, end=' | ')
+        rows = ["Freq.SS | Likelih. | N.abbrev. | N.starters | N.inside | Word"]
+    else:
+        rows = ["Likelih. | N.abbrev. | N.starters | Word"]
+
+    for continuation, inside_count, starter_count, abbrev_count in \
+            zip(continuations, *counts):
+        total = starter_count + inside_count
+        after_dot = starter_count + abbrev_count
+        ss_fraction = (starter_count / float(total)) if total > 0 else 0.0
+        likelihood = (abbrev_count / after_dot) if after_dot > 0 else 0.0
+        row = ['%.3f' % likelihood, str(abbrev_count), str(starter_count)]
+
+        if not args.abbreviations:
+            row.insert(0, '%.3f' % ss_fraction)
+            row.append(str(inside_count))
+
+        row.append(continuation)
+        rows.append(' | '.join(row))
+
+    # a single write of the whole report
+    sys.stdout.write('\n'.join(rows))
+    sys.stdout.write('\n')
+
+    return 0
+
 
-    print(continuation)
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
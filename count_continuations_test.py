@@ -0,0 +1,124 @@
+# coding=utf-8
+import os
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+import count_continuations
+from count_continuations import scanner, count_table, ascii_compatible
+
+
+def count(continuations, text, abbreviations=False):
+    """The (inside, starters, abbreviations) counts of each continuation in `text`."""
+    scan = scanner(continuations, abbreviations, 'utf-8')
+    counts = count_table(len(continuations))
+    scan([text.encode('utf-8')], counts)
+    return [tuple(token_counts) for token_counts in zip(*counts)]
+
+
+@patch.object(count_continuations, 'hyperscan', None)
+class TestScanner(TestCase):
+
+    TEXT = "Das ist café und mehr.\nCafé ist gut. café ok\nüber alles. Über\n"
+
+    def test_ascii_continuations(self):
+        self.assertEqual([(1, 0, 0), (2, 0, 0)], count(['und', 'ist'], self.TEXT))
+
+    def test_non_ascii_continuations(self):
+        self.assertEqual([(2, 1, 1), (1, 1, 0)], count(['café', 'über'], self.TEXT))
+
+    def test_mixed_continuations(self):
+        self.assertEqual([(2, 1, 1), (1, 0, 0)], count(['café', 'und'], self.TEXT))
+
+    def test_non_ascii_corpus(self):
+        text = "Ende. And the and x.\u00A0and \u00E9and\n"
+        self.assertEqual([(2, 1, 1)], count(['and'], text))
+        self.assertEqual([(2, 1, 1)], count(['and'], text.replace('\u00A0', ' ')))
+
+    def test_information_separators(self):
+        self.assertEqual([(2, 1, 1)], count(['and'], "Ende. And the and x.\x1Cand\n"))
+
+    def test_plain_blocks(self):
+        text = "and. And\n"
+        scan = scanner(['and'], False, 'utf-8')
+        counts = count_table(1)
+        scan([text.encode('utf-8'), ('\u00E9\n' + text).encode('utf-8'), '\u00E9\n' + text], counts)
+        self.assertEqual([(3, 3, 0)], [tuple(token_counts) for token_counts in zip(*counts)])
+
+
+class TestAsciiCompatible(TestCase):
+
+    def test_compatible(self):
+        for encoding in ('utf-8', 'latin-1', 'cp1252', 'shift_jis'):
+            self.assertTrue(ascii_compatible(encoding), encoding)
+
+    def test_incompatible(self):
+        for encoding in ('utf-16', 'utf-16-le', 'utf-32', 'utf-7', 'cp037', 'iso2022_jp'):
+            self.assertFalse(ascii_compatible(encoding), encoding)
+
+    def test_unknown(self):
+        self.assertRaises(LookupError, ascii_compatible, 'no-such-encoding')
+
+
+class TestMain(TestCase):
+
+    SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'count_continuations.py')
+
+    def report(self, *continuations, encoding='utf-8'):
+        text = "Das ist gut und mehr.\nUnd so. und es ist gut und schön.\n"
+        output = subprocess.run([sys.executable, self.SCRIPT, '-e', encoding] + list(continuations),
+                                input=text.encode(encoding), stdout=subprocess.PIPE,
+                                check=True).stdout
+        return output.decode('utf-8').splitlines()[1:]
+
+    def test_report(self):
+        self.assertEqual(['0.250 | 0.500 | 1 | 1 | 3 | und', '0.000 | 0.000 | 0 | 0 | 2 | ist'],
+                         self.report('und', 'ist'))
+
+    def test_repeated_token(self):
+        self.assertEqual(['0.250 | 0.500 | 1 | 1 | 3 | und'], self.report('und', 'und'))
+
+    def test_encodings(self):
+        expected = self.report('und', 'schön')
+
+        for encoding in ('latin-1', 'utf-16'):
+            self.assertEqual(expected, self.report('und', 'schön', encoding=encoding), encoding)
+
+    def test_unknown_encoding(self):
+        process = subprocess.run([sys.executable, self.SCRIPT, '-e', 'no-such-encoding', 'und'],
+                                 stdin=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self.assertEqual(2, process.returncode)
+        self.assertIn(b'unknown encoding', process.stderr)
+
+
+@skipIf(count_continuations.hyperscan is None, 'hyperscan is not installed')
+class TestHyperscan(TestCase):
+
+    TEXT = "a.a.a end. And\tAnd\t\tAnd x. \tAnd\n>  And a.a.a.a. and\nAnd so on.\n"
+    NON_ASCII_TEXT = "Ende. And the and x.\u00A0and \u00E9and. So on\u00E9 a.a\u00A0on\n"
+    TOKENS = ['a.a', 'and', 'so', 'on']
+
+    def assert_same_counts(self, abbreviations):
+        for text in (self.TEXT, self.NON_ASCII_TEXT):
+            found = count(self.TOKENS, text, abbreviations)
+
+            with patch.object(count_continuations, 'hyperscan', None):
+                expected = count(self.TOKENS, text, abbreviations)
+
+            if abbreviations:  # the inside counts are not reported
+                found = [counts[1:] for counts in found]
+                expected = [counts[1:] for counts in expected]
+
+            self.assertEqual(expected, found, text)
+
+    def test_non_ascii_corpus(self):
+        self.assertEqual((2, 1, 1), count(self.TOKENS, self.NON_ASCII_TEXT)[1])
+
+    def test_overlapping_matches(self):
+        self.assertEqual((3, 0, 0), count(self.TOKENS, self.TEXT)[0])
+
+    def test_same_counts(self):
+        self.assert_same_counts(False)
+
+    def test_same_counts_abbreviations(self):
+        self.assert_same_counts(True)
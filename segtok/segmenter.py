@@ -25,9 +25,11 @@ Sentence splits will always be enforced at [consecutive] line separators.
 Important: Windows text files use ``\\r\\n`` as linebreaks and Mac files use ``\\r``;
 Convert the text to Unix linebreaks if the case.
 """
-from __future__ import absolute_import, unicode_literals
 import codecs
-from regex import compile, DOTALL, UNICODE, VERBOSE
+import re
+from functools import lru_cache
+
+from regex import compile, DOTALL, REVERSE, UNICODE, VERBOSE
 
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
@@ -41,6 +43,44 @@ SENTENCE_TERMINALS = '.!?\u203C\u203D\u2047\u2048\u2049\u3002' \
 HYPHENS = '\u00AD\u058A\u05BE\u0F0C\u1400\u1806\u2010-\u2012\u2e17\u30A0-'
 "Any valid word-breaking hyphen, including ASCII hyphen minus."
 
+
+def _suffix_trie(words):
+    """
+    Build a regex alternation of the `words` as a trie of their shared endings.
+
+    The words may use escaped characters and optional (``?``) atoms, which are kept whole.
+    """
+    trie = {}
+
+    for word in words:
+        node = trie
+
+        for atom in reversed(re.findall(r'\\.\??|.\??', word)):
+            node = node.setdefault(atom, {})
+
+        node[''] = None  # word end
+
+    def alternation(node):
+        branches = ['%s%s' % (alternation(node[atom]), atom) for atom in sorted(node) if atom]
+
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        elif branches:
+            return '(?:%s)%s' % ('|'.join(branches), '?' if '' in node else '')
+        else:
+            return ''
+
+    return alternation(trie)
+
+
+def _reversed(pattern):
+    """Compile a copy of the end-anchored `pattern` that the regex engine scans from the end.
+
+    The copy finds a match iff `pattern` does, but its match span may differ.
+    """
+    return compile(pattern.pattern, pattern.flags | REVERSE)
+
+
 # Use upper-case for abbreviations that always are capitalized:
 # Lower-case abbreviations may occur capitalized or not.
 # Only abbreviations that should never occur at the end of a sentence
@@ -53,9 +93,9 @@ Jän Jan Ene Feb Mär Mar Apr Abr May Jun Jul Aug Sep Sept Oct Okt Nov Dic Dez D
 E\.U U\.K U\.S
 """.split()
 ABBREVIATIONS.extend(a.capitalize() for a in ABBREVIATIONS if a[0].islower())
-ABBREVIATIONS = '|'.join(sorted(ABBREVIATIONS))
+ABBREVIATIONS = _suffix_trie(ABBREVIATIONS)
 ABBREVIATIONS = compile(r"""
-(?: \b(?:%s) # 1. known abbreviations,
+(?: \b%s     # 1. known abbreviations,
 |   ^\S      # 2. a single, non-space character "sentence" (only),
 |   ^\d+     # 3. a series of digits "sentence" (only), or
 |   (?: \b   # 4. terminal letters A.-A, A.A, or A, if prefixed with:
@@ -84,6 +124,12 @@ Common abbreviations at the candidate sentence end that normally don't terminate
 Note that a check is required to ensure the potential abbreviation is actually followed by a dot
 and not some other sentence segmentation marker.
 """
+# The segmenter searches REVERSE copies of the patterns anchored at the end ($):
+# Scanning from the end of the string finds (or rules out) the match without trying every offset.
+# The public patterns keep their forward semantics (e.g., for match).
+# Only whether a REVERSE copy matches is the same; its match may start later than the forward one
+# (e.g., "U.S" instead of "By U.S"), so the segmenter never uses the spans of the reverse matches.
+_ABBREVIATIONS_REVERSE = _reversed(ABBREVIATIONS)
 
 # PMC OA corpus statistics
 # SSs: sentence starters
@@ -106,11 +152,14 @@ and not some other sentence segmentation marker.
 # Grey zone: undecidable words -> leave in to bias towards under-splitting
 # whether
 
+# Patterns free of \p{..} properties and of \b, \s, or \w use the faster stdlib engine;
+# The word and space classes of the two engines disagree on a few code points.
 ENDS_IN_DATE_DIGITS = compile(r"\b[0123]?[0-9]$")
-MONTH = compile(r"(J[äa]n|Ene|Feb|M[äa]r|A[pb]r|May|Jun|Jul|Aug|Sep|O[ck]t|Nov|D[ei][cz]|0?[1-9]|1[012])")
+MONTH = re.compile(r"(J[äa]n|Ene|Feb|M[äa]r|A[pb]r|May|Jun|Jul|Aug|Sep|O[ck]t|Nov|D[ei][cz]|0?[1-9]|1[012])")
 """
 Special facilities to detect European-style dates.
 """
+_ENDS_IN_DATE_DIGITS_REVERSE = _reversed(ENDS_IN_DATE_DIGITS)
 
 CONTINUATIONS = compile(r""" ^ # at string start only
 (?: a(?: nd|re )
@@ -143,6 +192,7 @@ LOWER_WORD = compile(r'^\p{Ll}+[%s]?\p{Ll}*\b' % HYPHENS, UNICODE)
 
 MIDDLE_INITIAL_END = compile(r'\b\p{Lu}\p{Ll}+\W+\p{Lu}$', UNICODE)
 "Upper-case initial after upper-case word at the end of a string."
+_MIDDLE_INITIAL_END_REVERSE = _reversed(MIDDLE_INITIAL_END)
 
 UPPER_WORD_START = compile(r'^\p{Lu}\p{Ll}+\b', UNICODE)
 "Upper-case word at the beginning of a string."
@@ -152,6 +202,7 @@ LONE_WORD = compile(r'^\p{Ll}+[\p{Ll}\p{Nd}%s]*$' % HYPHENS, UNICODE)
 
 UPPER_CASE_END = compile(r'\b[\p{Lu}\p{Lt}]\p{L}*\.\s+$', UNICODE)
 "Inside brackets, 'Words' that can be part of a proper noun abbreviation, like a journal name."
+_UPPER_CASE_END_REVERSE = _reversed(UPPER_CASE_END)
 UPPER_CASE_START = compile(r'^(?:(?:\(\d{4}\)\s)?[\p{Lu}\p{Lt}]\p{L}*|\d+)[\.,:]\s+', UNICODE)
 "Inside brackets, 'Words' that can be part of a large abbreviation, like a journal name."
 
@@ -159,18 +210,23 @@ SHORT_SENTENCE_LENGTH = 55
 "Length of either sentence fragment inside brackets to assume the fragment is not its own sentence."
 # This can be increased/decreased to heighten/lower the likelihood of splits inside brackets.
 
-NON_UNIX_LINEBREAK = compile(r'(?:\r\n|\r|\u2028)', UNICODE)
+NON_UNIX_LINEBREAK = re.compile(r'(?:\r\n|\r|\u2028)', re.UNICODE)
 "All linebreak sequence variants except the Unix newline (only)."
 
-SEGMENTER_REGEX = r"""
-(                       # A sentence ends at one of two sequences:
-    [%s]                # Either, a sequence starting with a sentence terminal,
+TERMINAL_SEQUENCE = r"""
+    [%s]                # a sequence starting with a sentence terminal,
     [\'\u2019\"\u201D]? # an optional right quote,
     [\]\)]*             # optional closing brackets and
     \s+                 # a sequence of required spaces.
-|                       # Otherwise,
+""" % SENTENCE_TERMINALS
+"The sentence terminal sequence shared by all segmentation patterns."
+
+SEGMENTER_REGEX = r"""
+(                       # A sentence ends at one of two sequences:
+                        # Either, the TERMINAL_SEQUENCE,
+%s|                       # Otherwise,
     \n{{{},}}           # a sentence also terminates at [consecutive] newlines.
-)""" % SENTENCE_TERMINALS
+)""" % TERMINAL_SEQUENCE
 """
 Sentence end a sentence terminal, followed by spaces.
 Optionally, a right quote and any number of closing brackets may succeed the terminal marker.
@@ -187,21 +243,48 @@ DO_NOT_CROSS_LINES = _compile(1)
 MAY_CROSS_ONE_LINE = _compile(2)
 "A segmentation pattern where two or more newline chars also terminate sentences."
 
+# Without any newlines in the text, the newline alternative is dead weight:
+SINGLE_LINE_ONLY = compile('(%s)' % TERMINAL_SEQUENCE, UNICODE | VERBOSE)
+"A segmentation pattern for texts without newline chars, where only terminals split sentences."
+
+
+CACHED_TEXT_LENGTH = 512
+"Texts up to this length (e.g., single lines) are memoized by `split_single`."
+
 
 def split_single(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH):
     """
     Default: split `text` at sentence terminals and at newline chars.
     """
-    sentences = _sentences(DO_NOT_CROSS_LINES.split(text), join_on_lowercase, short_sentence_length)
+    if len(text) <= CACHED_TEXT_LENGTH:
+        return list(_split_single_cached(text, join_on_lowercase, short_sentence_length))
+
+    return _split_single(text, join_on_lowercase, short_sentence_length)
+
+
+def _split_single(text, join_on_lowercase, short_sentence_length):
+    """Split `text` at sentence terminals and at newline chars, without caching."""
+    if '\n' not in text:
+        return list(_sentences(text, SINGLE_LINE_ONLY, join_on_lowercase, short_sentence_length))
+
+    sentences = _sentences(text, DO_NOT_CROSS_LINES, join_on_lowercase, short_sentence_length)
     return [s for ss in sentences  for s in ss.split('\n')]
 
 
+# Corpora often repeat short lines (headers, boilerplate), so memoize their splits per process;
+# The cache holds tuples, as the lists returned by split_single may be modified by the caller.
+@lru_cache(maxsize=4096)
+def _split_single_cached(text, join_on_lowercase, short_sentence_length):
+    return tuple(_split_single(text, join_on_lowercase, short_sentence_length))
+
+
 def split_multi(text, join_on_lowercase=False, short_sentence_length=SHORT_SENTENCE_LENGTH):
     """
     Sentences may contain non-consecutive (single) newline chars, while consecutive newline chars
     ("paragraph separators") always split sentences.
     """
-    return _sentences(MAY_CROSS_ONE_LINE.split(text), join_on_lowercase, short_sentence_length)
+    pattern = SINGLE_LINE_ONLY if '\n' not in text else MAY_CROSS_ONE_LINE
+    return _sentences(text, pattern, join_on_lowercase, short_sentence_length)
 
 
 def split_newline(text):
@@ -230,8 +313,10 @@ def rewrite_line_separators(text, pattern, join_on_lowercase=False,
     """
     offset = 0
 
-    for sentence in _sentences(pattern.split(text), join_on_lowercase, short_sentence_length):
-        start = text.index(sentence, offset)
+    for start, end in _sentence_offsets(text, pattern, join_on_lowercase, short_sentence_length):
+        if start == end:
+            start = end = offset  # place empty sentences right after the previous one
+
         intervening = text[offset:start]
 
         if offset != 0 and '\n' not in intervening:
@@ -239,8 +324,8 @@ def rewrite_line_separators(text, pattern, join_on_lowercase=False,
             intervening = intervening[1:]
 
         yield intervening
-        yield sentence.replace('\n', ' ')
-        offset = start + len(sentence)
+        yield text[start:end].replace('\n', ' ')
+        offset = end
 
     if offset < len(text):
         yield text[offset:]
@@ -248,141 +333,197 @@ def rewrite_line_separators(text, pattern, join_on_lowercase=False,
 
 def to_unix_linebreaks(text):
     """Replace non-Unix linebreak sequences (Windows, Mac, Unicode) with newlines (\\n)."""
-    return NON_UNIX_LINEBREAK.sub('\n', text)
-
-
-def _sentences(spans, join_on_lowercase, short_sentence_length):
-    """Join spans back together into sentences as necessary."""
-    last = None
-    shorterThanATypicalSentence = lambda c, l: c < short_sentence_length or l < short_sentence_length
-
-    for current in _abbreviation_joiner(spans):
-        if last is not None:
-            if (join_on_lowercase or BEFORE_LOWER.match(last)) and LOWER_WORD.match(current):
-                last = '%s%s' % (last, current)
-            elif shorterThanATypicalSentence(len(current), len(last)) and _is_open(last) and (
-                _is_not_opened(current) or last.endswith(' et al. ') or (
-                    UPPER_CASE_END.search(last) and UPPER_CASE_START.match(current)
-                )
-            ):
-                last = '%s%s' % (last, current)
-            elif shorterThanATypicalSentence(len(current), len(last)) and _is_open(last, '[]') and (
-                _is_not_opened(current, '[]') or last.endswith(' et al. ') or (
-                    UPPER_CASE_END.search(last) and UPPER_CASE_START.match(current)
-                )
-            ):
-                last = '%s%s' % (last, current)
-            elif CONTINUATIONS.match(current):
-                last = '%s%s' % (last, current)
-            else:
-                yield last.strip()
-                last = current
+    # same as NON_UNIX_LINEBREAK.sub('\n', text), but plain replacements are much faster
+    return text.replace('\r\n', '\n').replace('\r', '\n').replace('\u2028', '\n')
+
+
+def _sentences(text, pattern, join_on_lowercase, short_sentence_length):
+    """Split `text` at the `pattern` and join the spans back into sentences as necessary."""
+    for start, end in _sentence_offsets(text, pattern, join_on_lowercase, short_sentence_length):
+        yield text[start:end]
+
+
+def _sentence_offsets(text, pattern, join_on_lowercase, short_sentence_length):
+    """Same as `_sentences`, but yield the (start, end) offsets of the (stripped) sentences."""
+    spans = _abbreviation_joiner(text, pattern)
+    start, end = next(spans)  # the joiner always yields at least one span
+    last = text[start:end]  # None if not sliced from the text since the last join
+    parens, brackets = _nesting(last, '()'), _nesting(last, '[]')
+
+    for offset, end in spans:
+        current = text[offset:end]
+        # join inside brackets only if either span is shorter than a typical sentence:
+        short = len(current) < short_sentence_length or offset - start < short_sentence_length
+        in_parens = short and (parens or 0) > 0
+        in_brackets = short and (brackets or 0) > 0
+
+        if LOWER_WORD.match(current) and \
+                (join_on_lowercase or _before_lower(_joined(text, start, offset, last))):
+            joined = True
+        elif (in_parens and _is_not_opened(current)) or \
+                (in_brackets and _is_not_opened(current, '[]')) or \
+                ((in_parens or in_brackets) and (
+                    text.endswith(' et al. ', start, offset) or
+                    (_upper_case_end(_joined(text, start, offset, last)) and
+                     UPPER_CASE_START.match(current))
+                )):
+            joined = True
         else:
+            joined = CONTINUATIONS.match(current) is not None
+
+        if joined:
+            last = None
+            parens = _nesting(current, '()', parens)
+            brackets = _nesting(current, '[]', brackets)
+        else:
+            yield _strip(_joined(text, start, offset, last), start)
+            start = offset
             last = current
+            parens, brackets = _nesting(last, '()'), _nesting(last, '[]')
+
+    yield _strip(_joined(text, start, end, last), start)  # the last sentence runs to the end
+
+
+def _joined(text, start, end, last):
+    """Get the sentence from `start` to `end`, or `last` if it was not extended by any joins."""
+    # after joins, the sentence is only sliced from the text if inspected
+    return text[start:end] if last is None else last
+
 
-    if last is not None:
-        yield last.strip()
-
-
-def _abbreviation_joiner(spans):
-    """Join spans that match the ABBREVIATIONS pattern."""
-    segment = None
-    makeSentence = lambda start, end: ''.join(spans[start:end])
-    total = len(spans)
-
-    for pos in range(total):
-        if pos and pos % 2:  # even => segment, uneven => (potential) terminal
-            prev_s = spans[pos - 1]
-            marker = spans[pos]
-            next_s = spans[pos+1] if pos + 1 < total else None
-
-            if prev_s[-1:].isspace():
-                pass # join
-            elif marker[0] == '.' and ABBREVIATIONS.search(prev_s):
-                pass # join
-            elif marker[0] == '.' and next_s and (
-                    LONE_WORD.match(next_s) or
-                    (ENDS_IN_DATE_DIGITS.search(prev_s) and MONTH.match(next_s)) or
-                    (MIDDLE_INITIAL_END.search(prev_s) and UPPER_WORD_START.match(next_s))
-                    ):
-                pass # join
-            else:
-                yield makeSentence(segment, pos + 1)
-                segment = None
-        elif segment is None:
-            segment = pos
-
-    if segment is not None:
-        yield makeSentence(segment, total)
+def _strip(span_str, offset):
+    """Get the offsets of `span_str` at `offset` with surrounding whitespace stripped."""
+    end = offset + len(span_str.rstrip())
+    return end - len(span_str.strip()), end
+
+
+def _abbreviation_joiner(text, pattern):
+    """Split `text` at the `pattern`, joining spans that end in abbreviations; Yields offsets."""
+    start = 0  # of the current segment
+    offset = 0  # of the span before the current terminal
+    matches = pattern.finditer(text)
+    terminal = next(matches, None)
+
+    while terminal is not None:
+        following = next(matches, None)
+        begin, end = terminal.span()
+        prev_s = text[offset:begin]
+        dot = text[begin] == '.'  # only a dot might mark an abbreviation
+
+        if prev_s[-1:].isspace():
+            pass # join
+        elif dot and _ABBREVIATIONS_REVERSE.search(prev_s):
+            pass # join
+        elif dot and _continues_after_dot(
+                prev_s, text[end:following.start()] if following is not None else text[end:]
+                ):
+            pass # join
+        else:
+            yield start, end
+            start = end
+
+        offset = end
+        terminal = following
+
+    yield start, len(text)
+
+
+def _continues_after_dot(prev_s, next_s):
+    """Check if the span after a dot continues the sentence (lone words, dates, or names)."""
+    return next_s and (
+        LONE_WORD.match(next_s) or
+        (_ENDS_IN_DATE_DIGITS_REVERSE.search(prev_s) and MONTH.match(next_s)) or
+        (_MIDDLE_INITIAL_END_REVERSE.search(prev_s) and UPPER_WORD_START.match(next_s))
+    )
+
+
+def _before_lower(span_str):
+    """Check if the span ends like BEFORE_LOWER, skipping the regex if it cannot."""
+    return span_str.rstrip().endswith(('.', '"', ')', ']')) and \
+        BEFORE_LOWER.match(span_str) is not None
+
+
+def _upper_case_end(span_str):
+    """Check if the span ends like UPPER_CASE_END, skipping the regex if it cannot."""
+    return span_str.rstrip().endswith('.') and _UPPER_CASE_END_REVERSE.search(span_str) is not None
 
 
 def _is_open(span_str, brackets='()'):
     """Check if the span ends with an unclosed `bracket`."""
-    offset = span_str.find(brackets[0])
-    nesting = 0 if offset == -1 else 1
-
-    while offset != -1:
-        opener = span_str.find(brackets[0], offset + 1)
-        closer = span_str.find(brackets[1], offset + 1)
-
-        if opener == -1:
-            if closer == -1:
-                offset = -1
-            else:
-                offset = closer
-                nesting -= 1
-        elif closer == -1:
-            offset = opener
-            nesting += 1
-        elif opener < closer:
-            offset = opener
-            nesting += 1
-        elif closer < opener:
-            offset = closer
-            nesting -= 1
-        else:
-            msg = 'at offset={}: closer={}, opener={}'
-            raise RuntimeError(msg.format(offset, closer, opener))
+    return (_nesting(span_str, brackets) or 0) > 0
+
+
+def _nesting(span_str, brackets, depth=None):
+    """
+    Add the `brackets` nesting of the span to the `depth` of the text before it.
+
+    The depth is None until the first opener; Closers before it are ignored.
+    """
+    if depth is None:
+        offset = span_str.find(brackets[0])
 
-    return nesting > 0
+        if offset == -1:
+            return None
+    else:
+        offset = 0
+
+    return (depth or 0) + span_str.count(brackets[0], offset) - span_str.count(brackets[1], offset)
 
 
 def _is_not_opened(span_str, brackets='()'):
     """Check if the span starts with an unopened `bracket`."""
     offset = span_str.rfind(brackets[1])
-    nesting = 0 if offset == -1 else 1
-
-    while offset != -1:
-        opener = span_str.rfind(brackets[0], 0, offset)
-        closer = span_str.rfind(brackets[1], 0, offset)
-
-        if opener == -1:
-            if closer == -1:
-                offset = -1
-            else:
-                offset = closer
-                nesting += 1
-        elif closer == -1:
-            offset = opener
-            nesting -= 1
-        elif closer < opener:
-            offset = opener
-            nesting -= 1
-        elif opener < closer:
-            offset = closer
-            nesting += 1
-        else:
-            msg = 'at offset={}: closer={}, opener={}'
-            raise RuntimeError(msg.format(offset, closer, opener))
 
-    return nesting > 0
+    # openers after the last closer are ignored
+    return offset != -1 and \
+        span_str.count(brackets[1], 0, offset) >= span_str.count(brackets[0], 0, offset)
+
+
+def _segment(text, multi, with_ids, normal_breaks, short_sentence_length):
+    """Segment one input text the way the command-line tool does and return the output."""
+    if with_ids:
+        tid, text = text.split('\t', 1)
+    else:
+        tid = None
+
+    if normal_breaks:
+        text = to_unix_linebreaks(text)
+
+    if not multi:
+        sentences = split_single(text, short_sentence_length=short_sentence_length)
+        text_spans = [i for s in sentences for i in (s, '\n')]
+    else:
+        text_spans = rewrite_line_separators(
+            text, MAY_CROSS_ONE_LINE, short_sentence_length=short_sentence_length
+        )
+
+    if tid is None:
+        return ''.join(text_spans)
+
+    output = []
+    last = '\n'
+    sid = 1
+
+    for span in text_spans:
+        if last == '\n' and span not in ('', '\n'):
+            output.append(f'{tid}\t{sid}\t')
+            sid += 1
+
+        output.append(span)
+
+        if span:
+            last = span
+
+    return ''.join(output)
 
 
 def main():
     # print one sentence per line
     from argparse import ArgumentParser
-    from sys import argv, stdout, stdin, stderr, getdefaultencoding, version_info
-    from os import path, linesep
+    from functools import partial
+    from io import TextIOWrapper
+    from multiprocessing import Pool
+    from sys import argv, stdout, stdin, getdefaultencoding
+    from os import path
 
     single, multi = 0, 1
 
@@ -402,6 +543,8 @@ def main():
                         default=SHORT_SENTENCE_LENGTH,
                         help="upper boundary for text spans that are not split "
                              "into sentences inside brackets [%(default)d]")
+    parser.add_argument('--jobs', '-j', metavar='N', type=int, default=1,
+                        help='number of processes to segment the files or lines with [1]')
     parser.add_argument('--encoding', '-e', help='force another encoding to use')
     mode = parser.add_mutually_exclusive_group()
     parser.set_defaults(mode=single)
@@ -411,78 +554,37 @@ def main():
                       help=split_multi.__doc__)
 
     args = parser.parse_args()
-    pattern = [DO_NOT_CROSS_LINES, MAY_CROSS_ONE_LINE, ][args.mode]
-    normal = to_unix_linebreaks if args.normal_breaks else lambda t: t
-
-    # fix broken Unicode handling in Python 2.x
-    # see http://www.macfreek.nl/memory/Encoding_of_Python_stdout
-    if args.encoding or version_info < (3, 0):
-        if version_info >= (3, 0):
-            stdout = stdout.buffer
-            stdin = stdin.buffer
-
-        stdout = codecs.getwriter(
-            args.encoding or 'utf-8'
-        )(stdout, 'xmlcharrefreplace')
 
-        stdin = codecs.getreader(
-            args.encoding or 'utf-8'
-        )(stdin, 'xmlcharrefreplace')
-
-        if not args.encoding:
-            stderr.write('wrapped segmenter stdio with UTF-8 de/encoders')
-            stderr.write(linesep)
+    if args.encoding:
+        stdout = TextIOWrapper(stdout.buffer, args.encoding, 'xmlcharrefreplace')
+        stdin = TextIOWrapper(stdin.buffer, args.encoding)
 
     if not args.files and args.mode != single:
         parser.error('only single line splitting mode allowed '
                      'when reading from STDIN')
 
-    def segment(text):
-        if not args.files and args.with_ids:
-            tid, text = text.split('\t', 1)
-        else:
-            tid = None
+    segment = partial(_segment, multi=(args.mode == multi),
+                      with_ids=(args.with_ids and not args.files),
+                      normal_breaks=args.normal_breaks,
+                      short_sentence_length=args.bracket_spans)
 
-        if args.mode == single:
-            sentences = split_single(normal(text), short_sentence_length=args.bracket_spans)
-            text_spans = [i for s in sentences for i in (s, '\n')]
-        else:
-            text_spans = rewrite_line_separators(
-                normal(text), pattern, short_sentence_length=args.bracket_spans
-            )
-
-        if tid is not None:
-            def write_ids(tid, sid):
-                stdout.write(tid)
-                stdout.write('\t')
-                stdout.write(str(sid))
-                stdout.write('\t')
-
-            last = '\n'
-            sid = 1
-
-            for span in text_spans:
-                if last == '\n' and span not in ('', '\n'):
-                    write_ids(tid, sid)
-                    sid += 1
-
-                stdout.write(span)
-
-                if span:
-                    last = span
-        else:
-            for span in text_spans:
-                stdout.write(span)
-
-    if args.files:
+    def read_files():
         for txt_file_path in args.files:
             with codecs.open(
                 txt_file_path, 'r', encoding=(args.encoding or 'utf-8')
             ) as fp:
-                segment(fp.read())
+                yield fp.read()
+
+    texts = read_files() if args.files else stdin
+
+    if args.jobs > 1:
+        # keep the input order; lines are small, so send them in batches
+        with Pool(args.jobs) as pool:
+            for output in pool.imap(segment, texts, 1 if args.files else 256):
+                stdout.write(output)
     else:
-        for line in stdin:
-            segment(line)
+        for text in texts:
+            stdout.write(segment(text))
 
 
 if __name__ == '__main__':
@@ -1,9 +1,10 @@
 # coding=utf-8
-from __future__ import absolute_import, division, unicode_literals
 from unittest import TestCase
 from segtok.segmenter import split_single, split_multi, MAY_CROSS_ONE_LINE, \
-    split_newline, rewrite_line_separators, ABBREVIATIONS, CONTINUATIONS, \
-    NON_UNIX_LINEBREAK, to_unix_linebreaks
+    split_newline, rewrite_line_separators, ABBREVIATIONS, CONTINUATIONS, SHORT_SENTENCE_LENGTH, \
+    NON_UNIX_LINEBREAK, to_unix_linebreaks, _segment, _is_open, _is_not_opened, _nesting, _suffix_trie, \
+    ENDS_IN_DATE_DIGITS, MIDDLE_INITIAL_END, UPPER_CASE_END, _ABBREVIATIONS_REVERSE, \
+    _ENDS_IN_DATE_DIGITS_REVERSE, _MIDDLE_INITIAL_END_REVERSE, _UPPER_CASE_END_REVERSE, _joined
 
 
 OSPL = """One sentence per line.
@@ -71,6 +72,59 @@ class TestToUnixLinebreak(TestCase):
         result = to_unix_linebreaks("This\r\none.")
         self.assertEqual("This\none.", result)
 
+    def test_all_linebreaks(self):
+        result = to_unix_linebreaks("One\rtwo\u2028three\r\r\nfour\n")
+        self.assertEqual("One\ntwo\nthree\n\nfour\n", result)
+
+class TestBrackets(TestCase):
+
+    def test_is_open(self):
+        for example in ('(a', 'a (b (c) d', ') (a', '((a) [b]'):
+            self.assertTrue(_is_open(example), example)
+
+        for example in ('a', 'a)', '(a)', '(a) b)', '[a'):
+            self.assertFalse(_is_open(example), example)
+
+    def test_is_not_opened(self):
+        for example in ('a)', 'a (b) c)', 'a) (b', 'a [b] c))'):
+            self.assertTrue(_is_not_opened(example), example)
+
+        for example in ('a', '(a', '(a)', '((a) b)', 'a]'):
+            self.assertFalse(_is_not_opened(example), example)
+
+    def test_nesting(self):
+        for parts in (['a) (b', ') c'], ['a)', ' (b (c', ')'], ['(a) ', ') (', 'b']):
+            depth = None
+
+            for part in parts:
+                depth = _nesting(part, '()', depth)
+
+            self.assertEqual(_nesting(''.join(parts), '()'), depth, parts)
+
+        self.assertIsNone(_nesting('a) b', '()'))
+
+    def test_joined(self):
+        text = 'One. Two. Three.'
+        last = text[5:9]
+        self.assertIs(last, _joined(text, 5, 16, last))
+        self.assertEqual('Two. Three.', _joined(text, 5, 16, None))
+
+    def test_square_brackets(self):
+        self.assertTrue(_is_open('a [b', '[]'))
+        self.assertTrue(_is_not_opened('a] b', '[]'))
+
+
+class TestSegment(TestCase):
+
+    def test_with_ids(self):
+        result = _segment('T1\tA b. C d.\n', False, True, False, SHORT_SENTENCE_LENGTH)
+        self.assertEqual('T1\t1\tA b.\nT1\t2\tC d.\n\n', result)
+
+    def test_multi(self):
+        result = _segment('A b\nc. D\ne.', True, False, False, SHORT_SENTENCE_LENGTH)
+        self.assertEqual('A b c.\nD e.', result)
+
+
 class TestSentenceSegmenter(TestCase):
 
     def setUp(self):
@@ -95,6 +149,28 @@ class TestSentenceSegmenter(TestCase):
                         'some Upper', 'in A, B', 'in A and B', 'A, B, and C'):
             self.assertTrue(ABBREVIATIONS.search(example) is None, example)
 
+    def test_end_patterns_match_forward(self):
+        for pattern, example in ((ABBREVIATIONS, 'see Mr'), (ENDS_IN_DATE_DIGITS, 'on 12'),
+                                 (MIDDLE_INITIAL_END, 'by Smith A'), (UPPER_CASE_END, 'x Foo. ')):
+            self.assertIsNone(pattern.match(example), example)
+            self.assertIsNotNone(pattern.search(example), example)
+
+    def test_reversed_end_patterns(self):
+        for pattern, reversed_pattern in ((ABBREVIATIONS, _ABBREVIATIONS_REVERSE),
+                                          (ENDS_IN_DATE_DIGITS, _ENDS_IN_DATE_DIGITS_REVERSE),
+                                          (MIDDLE_INITIAL_END, _MIDDLE_INITIAL_END_REVERSE),
+                                          (UPPER_CASE_END, _UPPER_CASE_END_REVERSE)):
+            # only whether they match is the same, as the reverse matches may start later
+            for example in ('see Mr', 'Of approx', 'By U.S', 'on 12', 'the 123', 'Smith A',
+                            'smith A', 'x Foo. ', 'x foo. ', 'A', ''):
+                found = pattern.search(example)
+                reversed_found = reversed_pattern.search(example)
+                self.assertEqual(found is None, reversed_found is None, example)
+
+    def test_suffix_trie(self):
+        words = ['Mr', 'Mrs', 'Dr', r'f\.?e', 'figs?']
+        self.assertEqual(r'(?:f\.?e|(?:D|M)r|Mrs|figs?)', _suffix_trie(words))
+
     def test_CONTINUATIONS_detected(self):
         for example in ('and this', 'are those'):
             self.assertTrue(CONTINUATIONS.search(example) is not None, example)
@@ -191,6 +267,12 @@ class TestSentenceSegmenter(TestCase):
                      "However, olfactory desensitizations did decrease Fos-lir."]
         self.assertSequenceEqual(sentences, list(split_single(' '.join(sentences))))
 
+    def test_cached_results_are_copies(self):
+        result = split_single("This is cached. So is this.")
+        result.append("Modified.")
+        self.assertSequenceEqual(["This is cached.", "So is this."],
+                                 split_single("This is cached. So is this."))
+
     def test_linebreak(self):
         text = "This is a\nmultiline sentence."
         self.assertSequenceEqual(text.split('\n'), list(split_single(text)))
@@ -5,18 +5,10 @@ Regex-based word tokenizers.
 Note that small/full/half-width character variants are *not* covered.
 If a text were to contains such characters, normalize it first.
 """
-from __future__ import absolute_import, unicode_literals
 import codecs
-try:
-    from html import unescape
-except ImportError:
-    # Python <= 3.3 doesn't have html.unescape
-    try:
-        from html.parser import HTMLParser
-    except ImportError:
-        # Python 2.x
-        from HTMLParser import HTMLParser
-    unescape = HTMLParser().unescape
+import re
+from functools import lru_cache
+from html import unescape
 
 from regex import compile, UNICODE, VERBOSE
 
@@ -51,7 +43,9 @@ POWER = r'\u207B?[\u00B9\u00B2\u00B3]'
 SUBDIGIT = r'[\u2080-\u2089]'
 """Subscript digits."""
 
-ALNUM = LETTER[:-1] + NUMBER[1:]
+_ALNUM_CLASS = r'\p{Ll}\p{Lm}\p{Lt}\p{Lu}\p{Nd}\p{Nl}'
+
+ALNUM = r'[%s]' % _ALNUM_CLASS
 """Any alphanumeric Unicode character: letter or number."""
 
 HYPHEN = r'[%s]' % HYPHENS
@@ -59,9 +53,21 @@ HYPHEN = r'[%s]' % HYPHENS
 SPACE = r'[\p{Zs}\t]'
 """Any unicode space character plus the (horizontal) tab."""
 
+TERMINALS = frozenset(SENTENCE_TERMINALS)
+"""The set of sentence terminal characters, for single character membership tests."""
+
+APOSTROPHE_SET = frozenset(APOSTROPHES)
+"""The set of all apostrophe-like marks, to quickly skip tokens without any of them."""
+
 APO_MATCHER = compile(APOSTROPHE, UNICODE)
 """Matcher for any apostrophe."""
 
+PLAIN_WORD = re.compile(r'[A-Za-z0-9]+\Z')
+"""Matcher for plain ASCII alphanumeric spans, which neither tokenizer pattern ever splits."""
+
+_SYMBOL_TOKEN = compile(r'%s+ | [^\s%s]+' % (ALNUM, _ALNUM_CLASS), UNICODE | VERBOSE)
+"""Matcher for the :func:`symbol_tokenizer` tokens: alphanumeric or other non-space runs."""
+
 HYPHENATED_LINEBREAK = compile(
     r'({alnum}{hyphen}){space}*?{linebreak}{space}*?({alnum})'.format(
         alnum=ALNUM, hyphen=HYPHEN, linebreak=LINEBREAK, space=SPACE
@@ -99,24 +105,24 @@ def split_possessive_markers(tokens):
     ['This', 'is', 'Fred', "'s", 'latest', 'book', '.']
 
     :param tokens: a list of tokens
-    :returns: an updated list if a split was made or the original list otherwise
+    :returns: a new list if a split was made or the original list otherwise
     """
-    idx = -1
+    result = []
 
-    for token in list(tokens):
-        idx += 1
-
-        if IS_POSSESSIVE.match(token) is not None:
+    for token in tokens:
+        if not APOSTROPHE_SET.isdisjoint(token) and IS_POSSESSIVE.match(token) is not None:
             if token[-1].lower() == 's' and token[-2] in APOSTROPHES:
-                tokens.insert(idx, token[:-2])
-                idx += 1
-                tokens[idx] = token[-2:]
+                result.append(token[:-2])
+                result.append(token[-2:])
+                continue
             elif token[-2].lower() == 's' and token[-1] in APOSTROPHES:
-                tokens.insert(idx, token[:-1])
-                idx += 1
-                tokens[idx] = token[-1:]
+                result.append(token[:-1])
+                result.append(token[-1:])
+                continue
+
+        result.append(token)
 
-    return tokens
+    return tokens if len(result) == len(tokens) else result
 
 
 def split_contractions(tokens):
@@ -126,27 +132,24 @@ def split_contractions(tokens):
     Takes the output of any of the tokenizer functions and produces and updated list.
 
     :param tokens: a list of tokens
-    :returns: an updated list if a split was made or the original list otherwise
+    :returns: a new list if a split was made or the original list otherwise
     """
-    idx = -1
+    result = []
 
-    for token in list(tokens):
-        idx += 1
+    for token in tokens:
+        if not APOSTROPHE_SET.isdisjoint(token) and IS_CONTRACTION.match(token) is not None:
+            # the contraction is one (d, m, s, t) or two (ll, re, ve) letters long
+            pos = len(token) - (2 if token[-2] in APOSTROPHES else 3)
 
-        if IS_CONTRACTION.match(token) is not None:
-            length = len(token)
+            if token[-1] == 't' and 0 < pos and token[pos - 1] == 'n':
+                pos -= 1
 
-            if length > 1:
-                for pos in range(length - 1, -1, -1):
-                    if token[pos] in APOSTROPHES:
-                        if 2 < length and pos + 2 == length and token[-1] == 't' and token[pos - 1] == 'n':
-                            pos -= 1
+            result.append(token[:pos])
+            result.append(token[pos:])
+        else:
+            result.append(token)
 
-                        tokens.insert(idx, token[:pos])
-                        idx += 1
-                        tokens[idx] = token[pos:]
-
-    return tokens
+    return tokens if len(result) == len(tokens) else result
 
 
 def _matches(regex):
@@ -168,7 +171,11 @@ def space_tokenizer(sentence):
     Split on Unicode spaces ``\\s+`` (i.e., any kind of **Unicode** space character).
     The separating space characters are not included in the resulting token list.
     """
-    return [token for token in space_tokenizer.split(sentence) if token]
+    if '\x1c' in sentence or '\x1d' in sentence or '\x1e' in sentence or '\x1f' in sentence:
+        # str.split would also split on these (ASCII information separators)
+        return [token for token in space_tokenizer.split(sentence) if token]
+
+    return sentence.split()
 
 
 @_matches(r'(%s+)' % ALNUM)
@@ -178,8 +185,12 @@ def symbol_tokenizer(sentence):
 
     Separates alphanumeric Unicode character sequences in already space-split tokens.
     """
-    return [token for span in space_tokenizer(sentence) for
-            token in symbol_tokenizer.split(span) if token]
+    # a single pass over the sentence instead of splitting each space-separated span
+    return _SYMBOL_TOKEN.findall(sentence)
+
+
+CACHED_SENTENCE_LENGTH = 256
+"""Sentences up to this length are memoized by :func:`word_tokenizer`."""
 
 
 @_matches(r"""((?:
@@ -233,48 +244,64 @@ def word_tokenizer(sentence):
        in the range from yocto, y (10^-24) to yotta, Y (10^+24)).
     6. Subscript digits are attached if prefixed with letters that look like a chemical formula.
     """
-    pruned = HYPHENATED_LINEBREAK.sub(r'\1\2', sentence)
+    if len(sentence) <= CACHED_SENTENCE_LENGTH:
+        return list(_word_tokenizer_cached(sentence))
+
+    return _word_tokenizer(sentence)
+
+
+def _word_tokenizer(sentence):
+    """Tokenize `sentence` like `word_tokenizer`, without caching."""
+    if '\n' in sentence or '\r' in sentence or '\u2028' in sentence:
+        pruned = HYPHENATED_LINEBREAK.sub(r'\1\2', sentence)
+    else:
+        pruned = sentence  # no linebreak, so nothing to join
+
     tokens = [token for span in space_tokenizer(pruned) for
-              token in word_tokenizer.split(span) if token]
+              token in ((span,) if PLAIN_WORD.match(span) else word_tokenizer.split(span)) if token]
 
     # splice the sentence terminal off the last word/token if it has any at its borders
     # only look for the sentence terminal in the last three tokens
-    for idx, word in enumerate(reversed(tokens[-3:]), 1):
+    for idx in range(1, min(len(tokens), 3) + 1):
+        word = tokens[-idx]
+
         if (word_tokenizer.match(word) and not APO_MATCHER.match(word)) or \
-                any(t in word for t in SENTENCE_TERMINALS):
+                not TERMINALS.isdisjoint(word):
             last = len(word) - 1
 
             if 0 == last or u'...' == word:
                 # any case of "..." or any single char (last == 0)
                 pass  # leave the token as it is
-            elif any(word.rfind(t) == last for t in SENTENCE_TERMINALS):
+            elif word[-1] in TERMINALS:
                 # "stuff."
                 tokens[-idx] = word[:-1]
                 tokens.insert(len(tokens) - idx + 1, word[-1])
-            elif any(word.find(t) == 0 for t in SENTENCE_TERMINALS):
+            elif word[0] in TERMINALS:
                 # ".stuff"
                 tokens[-idx] = word[0]
                 tokens.insert(len(tokens) - idx + 1, word[1:])
 
             break
 
-    # keep splicing off any dangling commas and (semi-) colons
-    dirty = True
-    while dirty:
-        dirty = False
+    # splice off any dangling commas and (semi-) colons in a single pass
+    result = []
+
+    for word in tokens:
+        if len(word) > 1 and word[-1] in u',;:':
+            stem = word.rstrip(u',;:') or word[0]  # a token of only marks keeps the first one
+            result.append(stem)
+            result.extend(word[len(stem):])  # one token per dangling comma/colon
+        else:
+            result.append(word)
 
-        for idx, word in enumerate(reversed(tokens), 1):
-            while len(word) > 1 and word[-1] in u',;:':
-                char = word[-1]  # the dangling comma/colon
-                word = word[:-1]
-                tokens[-idx] = word
-                tokens.insert(len(tokens) - idx + 1, char)
-                idx += 1
-                dirty = True
-            if dirty:
-                break  # restart check to avoid index errors
+    return result
 
-    return tokens
+
+# Corpora often repeat short sentences (headers, dates, stock phrases), so memoize them per process;
+# The cache holds tuples, as the lists returned by word_tokenizer may be modified by the caller.
+@lru_cache(maxsize=4096)
+def _word_tokenizer_cached(sentence):
+    return tuple(_word_tokenizer(sentence))
 
 
 @_matches(r"""
@@ -304,26 +331,28 @@ def web_tokenizer(sentence):
     e-mail addresses. It also un-escapes all escape sequences (except in URIs or email addresses).
     """
     return [token for i, span in enumerate(web_tokenizer.split(sentence))
-            for token in ((span,) if i % 2 else word_tokenizer(unescape(span)))]
+            for token in ((span,) if i % 2 else
+                          word_tokenizer(unescape(span) if '&' in span else span))]
 
 
-def main():
-    # tokenize one sentence per line input
-    from argparse import ArgumentParser
-    from sys import argv, stdout, stdin, stderr, getdefaultencoding, version_info
-    from os import path, linesep
+def _tokenize(sentence, tokenizer, splitter=None):
+    """Tokenize one input line the way the command-line tool does and return the output."""
+    tokens = tokenizer(sentence)
 
-    def _tokenize(sentence, tokenizer):
-        sep = None
+    if splitter is not None:
+        tokens = splitter(tokens)
 
-        for token in tokenizer(sentence):
-            if sep is not None:
-                stdout.write(sep)
+    return ' '.join(tokens)
 
-            stdout.write(token)
-            sep = ' '
 
-        stdout.write(linesep)
+def main():
+    # tokenize one sentence per line input
+    from argparse import ArgumentParser
+    from functools import partial
+    from io import TextIOWrapper
+    from multiprocessing import Pool
+    from sys import argv, stdout, stdin, getdefaultencoding
+    from os import path, linesep
 
     NUM_TOKENIZERS = 4
     SPACE, ALNUM, TOKEN, WEB = list(range(NUM_TOKENIZERS))
@@ -343,6 +372,8 @@ def main():
                         help='split off the possessive marker from alphanumeric tokens')
     parser.add_argument('--split-contractions', '-c', action='store_true',  # TODO
                         help='split contractions like "don\'t" in alphanumeric tokens in two')
+    parser.add_argument('--jobs', '-j', metavar='N', type=int, default=1,
+                        help='number of processes to tokenize the lines with [1]')
     parser.add_argument('--encoding', '-e', help='define encoding to use')
     mode = parser.add_mutually_exclusive_group()
     parser.set_defaults(mode=TOKEN)
@@ -356,37 +387,38 @@ def main():
                       help=web_tokenizer.__doc__)
 
     args = parser.parse_args()
-    tokenizer_func = TOKENIZER[args.mode]
-
-    # fix broken Unicode handling in Python 2.x
-    # see http://www.macfreek.nl/memory/Encoding_of_Python_stdout
-    if args.encoding or version_info < (3, 0):
-        if version_info >= (3, 0):
-            stdout = stdout.buffer
-            stdin = stdin.buffer
 
-        stdout = codecs.getwriter(args.encoding or 'utf-8')(stdout, 'xmlcharrefreplace')
-        stdin = codecs.getreader(args.encoding or 'utf-8')(stdin, 'xmlcharrefreplace')
-
-        if not args.encoding:
-            stderr.write('wrapped tokenizer stdio with UTF-8 de/encoders')
-            stderr.write(linesep)
+    if args.encoding:
+        stdout = TextIOWrapper(stdout.buffer, args.encoding, 'xmlcharrefreplace')
+        stdin = TextIOWrapper(stdin.buffer, args.encoding)
 
     if args.split_contractions:
-        tokenizer = lambda sentence: split_contractions(tokenizer_func(sentence))
+        splitter = split_contractions
     elif args.possessive_marker:
-        tokenizer = lambda sentence: split_possessive_markers(tokenizer_func(sentence))
+        splitter = split_possessive_markers
     else:
-        tokenizer = tokenizer_func
+        splitter = None
+
+    tokenize = partial(_tokenize, tokenizer=TOKENIZER[args.mode], splitter=splitter)
 
-    if args.files:
+    def read_files():
         for txt_file_path in args.files:
             with codecs.open(txt_file_path, 'r', encoding=(args.encoding or 'utf-8')) as fp:
                 for line in fp:
-                    _tokenize(line, tokenizer)
+                    yield line
+
+    lines = read_files() if args.files else stdin
+
+    if args.jobs > 1:
+        # keep the input order; lines are small, so send them in batches
+        with Pool(args.jobs) as pool:
+            for output in pool.imap(tokenize, lines, 256):
+                stdout.write(output)
+                stdout.write(linesep)
     else:
-        for line in stdin:
-            _tokenize(line, tokenizer)
+        for line in lines:
+            stdout.write(tokenize(line))
+            stdout.write(linesep)
 
 
 if __name__ == '__main__':
@@ -1,8 +1,7 @@
 # coding=utf-8
-from __future__ import absolute_import, division, unicode_literals
 from unittest import TestCase
 from segtok.tokenizer import space_tokenizer, symbol_tokenizer, word_tokenizer, web_tokenizer, IS_POSSESSIVE, \
-    split_possessive_markers, IS_CONTRACTION, split_contractions
+    split_possessive_markers, IS_CONTRACTION, split_contractions, APOSTROPHE_SET, PLAIN_WORD, _tokenize
 
 __author__ = 'Florian Leitner <florian.leitner@gmail.com>'
 
@@ -40,6 +39,19 @@ class TestPossessiveMarker(TestCase):
         self.assertEqual(stem, 'a')
         self.assertEqual(marker, "\u2032s")
 
+    def test_split_returns_new_list(self):
+        tokens = ["Fred's", 'book']
+        result = split_possessive_markers(tokens)
+        self.assertEqual(["Fred's", 'book'], tokens)
+        self.assertEqual(['Fred', "'s", 'book'], result)
+        self.assertIsNot(tokens, result)
+
+    def test_apostrophe_set(self):
+        for apo in "'\u00B4\u02B9\u02BC\u2019\u2032":
+            self.assertIn(apo, APOSTROPHE_SET)
+            self.assertIsNotNone(IS_POSSESSIVE.match(f"Frank{apo}s"))
+            self.assertIsNotNone(IS_CONTRACTION.match(f"Frank{apo}d"))
+
 
 class TestContractions(TestCase):
 
@@ -69,11 +81,26 @@ class TestContractions(TestCase):
         self.assertEqual(stem, 'do')
         self.assertEqual(contraction, "n't")
 
+    def test_split_returns_new_list(self):
+        tokens = ["don't", 'go']
+        result = split_contractions(tokens)
+        self.assertEqual(["don't", 'go'], tokens)
+        self.assertEqual(['do', "n't", 'go'], result)
+        self.assertIsNot(tokens, result)
+
     def test_split_unicode(self):
         stem, contraction = split_contractions(["a\u2032d"])
         self.assertEqual(stem, 'a')
         self.assertEqual(contraction, "\u2032d")
 
+    def test_split_after_modifier_letter(self):
+        stem, contraction = split_contractions(["\u02BCwe're"])
+        self.assertEqual(stem, '\u02BCwe')
+        self.assertEqual(contraction, "'re")
+
+    def test_split_several_apostrophes(self):
+        self.assertEqual(['r\u02B9L', "n't"], split_contractions(["r\u02B9Ln't"]))
+
 
 class TestSpaceTokenizer(TestCase):
 
@@ -88,6 +115,10 @@ class TestSpaceTokenizer(TestCase):
         sentence = u"1\u00A02\u2007 3  \u2007  "
         self.assertSequenceEqual([u'1', u'2', u'3'], self.tokenizer(sentence))
 
+    def test_information_separators(self):
+        sentence = u"1\x1c2 3\x1f"
+        self.assertSequenceEqual([u'1\x1c2', u'3\x1f'], self.tokenizer(sentence))
+
 
 class TestSymbolTokenizer(TestCase):
 
@@ -111,6 +142,10 @@ class TestSymbolTokenizer(TestCase):
         tokens = [u'123', u'-', u'ABC', u'\u2011', u'DEF', u'\u2015', u'XYZ']
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
+    def test_split_pattern(self):
+        self.assertSequenceEqual([u'', u'ab', u'-', u'cd', u' ', u'ef', u''],
+                                 self.tokenizer.split(u'ab-cd ef'))
+
     def test_slashes(self):
         sentence = u"kg/meter"
         tokens = [u'kg', u'/', u'meter']
@@ -128,8 +163,8 @@ class TestWordTokenizer(TestCase):
         self.tokenizer = word_tokenizer
 
     def assert_inner(self, sep):
-        sentence = u" 123%s456 abc%sdef " % (sep, sep)
-        tokens = [u'123%s456' % sep, u'abc%sdef' % sep]
+        sentence = f" 123{sep}456 abc{sep}def "
+        tokens = [f'123{sep}456', f'abc{sep}def']
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
     def test_hyphen_inner(self):
@@ -150,7 +185,7 @@ class TestWordTokenizer(TestCase):
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
     def assert_dangling(self, sep):
-        sentence = u"that %sbut not%s this" % (sep, sep)
+        sentence = f"that {sep}but not{sep} this"
         tokens = [u'that', sep, u'but', u'not', sep, u'this']
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
@@ -177,7 +212,7 @@ class TestWordTokenizer(TestCase):
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
     def assert_terminal(self, sep):
-        sentence = u"A%s" % sep
+        sentence = f"A{sep}"
         tokens = [u'A', sep]
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
@@ -317,6 +352,25 @@ class TestWordTokenizer(TestCase):
                   u'/', u'to.file', u'?', u'kwd', u'=', u'1', u'&', u'arg']
         self.assertSequenceEqual(tokens, self.tokenizer(sentence))
 
+    def test_plain_words(self):
+        for span in (u'a', u'Word', u'km2', u'H2O', u'5a', u'ABC123xyz'):
+            self.assertIsNotNone(PLAIN_WORD.match(span))
+            self.assertSequenceEqual([u'', span, u''], word_tokenizer.split(span))
+            self.assertSequenceEqual([u'', span, u''], symbol_tokenizer.split(span))
+
+        for span in (u'km\u00B2', u'H\u2082O', u'a.', u'\u00C9t\u00E9', u'a1\n'):
+            self.assertIsNone(PLAIN_WORD.match(span))
+
+    def test_cached_results_are_copies(self):
+        result = self.tokenizer(u"This is cached.")
+        result.append(u"modified")
+        self.assertSequenceEqual([u'This', u'is', u'cached', u'.'], self.tokenizer(u"This is cached."))
+
+    def test_long_sentence(self):
+        sentence = u"word, " * 100 + u"end."
+        tokens = [u'word', u','] * 100 + [u'end', u'.']
+        self.assertSequenceEqual(tokens, self.tokenizer(sentence))
+
 
 class TestWebTokenizer(TestCase):
 
@@ -374,3 +428,13 @@ class TestWebTokenizer(TestCase):
             children ( P = 0.02 ; http://univ.edu.es/study.html ) [ 20-22 ] .
         """.split()
         self.assertEqual(tokens, self.tokenizer(sentence))
+
+
+class TestTokenize(TestCase):
+
+    def test_tokenizer(self):
+        self.assertEqual("Fred's book .", _tokenize("Fred's book.\n", word_tokenizer))
+
+    def test_splitter(self):
+        result = _tokenize("Fred's book.\n", word_tokenizer, split_possessive_markers)
+        self.assertEqual("Fred 's book .", result)
@@ -10,7 +10,7 @@ except IOError:
 
 setup(
     name='segtok',
-    version='1.5.11',
+    version='1.6.0',
     url='https://github.com/fnl/segtok',
     author='Florian Leitner',
     author_email='florian.leitner@gmail.com',
@@ -19,7 +19,8 @@ setup(
     license='MIT',
     license_files=('LICENSE.txt',),
     packages=['segtok'],
-    install_requires=['regex'],  # handles all Unicode categories in Regular Expressions
+    python_requires='>=3.8',
+    install_requires=['regex>=2023.10.3'],  # handles all Unicode categories in Regular Expressions
     long_description=long_description,
     entry_points={
         'console_scripts': [
@@ -30,13 +31,12 @@ setup(
     classifiers=[
         'Development Status :: 3 - Alpha',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3 :: Only',
         'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Scientific/Engineering :: Information Analysis',
         'Topic :: Software Development :: Libraries',
         'Topic :: Text Processing',